@@ -23,6 +23,21 @@ class Settings(BaseSettings):
         jwt_secret: Secret key for JWT token signing (MUST be changed in production)
         jwt_algorithm: Algorithm used for JWT encoding (HS256 is symmetric)
         access_token_expire_minutes: JWT access token expiration time in minutes
+        bcrypt_rounds: bcrypt cost factor for new password hashes (each +1 doubles hashing time)
+        prehash_passwords: SHA-256 passwords before bcrypt; older hashes are upgraded on login
+        bcrypt_workers: bcrypt processes per app worker (capped at the CPU count)
+        db_pool_size: Number of persistent connections kept in the pool
+        db_max_overflow: Extra connections allowed above db_pool_size under burst load
+        db_pool_timeout: Seconds to wait for a free connection before failing
+        db_pool_recycle: Seconds after which a pooled connection is replaced
+        db_query_cache_size: Number of compiled SQL statements kept per engine
+        db_echo: Log every SQL statement (debugging only, very noisy)
+        db_pgbouncer: Set when connecting through PgBouncer in transaction-pooling mode
+
+    Pool limits apply per app worker. Keep
+    workers * (db_pool_size + db_max_overflow) below PostgreSQL's
+    max_connections (100 by default), with room left for init_db.py and admin
+    sessions; the defaults give 4 gunicorn workers at most 80 connections.
     """
     cors_origins: str = "http://localhost:3000"
     env: str = "development"
@@ -30,6 +45,16 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me-in-production"  # WARNING: Change this in production!
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    bcrypt_rounds: int = 12
+    prehash_passwords: bool = False
+    bcrypt_workers: int = 2
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_query_cache_size: int = 1200
+    db_echo: bool = False
+    db_pgbouncer: bool = False
 
     @property
     def async_database_url(self) -> str:
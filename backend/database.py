@@ -9,9 +9,14 @@ The async configuration allows non-blocking database operations, which is
 essential for handling concurrent requests efficiently.
 """
 
+import asyncio
 import ssl
+import uuid
+from contextlib import asynccontextmanager
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 
 # Create SSL context for secure database connections (required by cloud providers)
@@ -19,20 +24,51 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
+# Connection arguments for asyncpg
+# ssl handles cloud PostgreSQL SSL requirements
+# Behind PgBouncer in transaction-pooling mode prepared statements cannot be
+# shared across server connections: both asyncpg's statement cache and
+# SQLAlchemy's own prepared statement cache are disabled, and statements get
+# unique names so asyncpg's numbered names cannot collide on a server connection
+connect_args = {}
+if "asyncpg" in settings.async_database_url:
+    connect_args["ssl"] = ssl_context
+    if settings.db_pgbouncer:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+
 # Create async database engine
-# echo=True enables SQL query logging (useful for debugging, disable in production)
 # The async_database_url property converts postgresql:// to postgresql+asyncpg://
-# connect_args with ssl handles cloud PostgreSQL SSL requirements
+# Pool sizing keeps enough connections for concurrent requests without each one
+# waiting on the default pool of 5, while the pools of all gunicorn workers
+# together stay below PostgreSQL's max_connections (see Settings).
+# pool_pre_ping discards connections dropped by the server and pool_recycle
+# replaces them before provider idle timeouts hit
 engine = create_async_engine(
     settings.async_database_url,
-    echo=True,
-    connect_args={"ssl": ssl_context} if "asyncpg" in settings.async_database_url else {}
+    echo=settings.db_echo,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    query_cache_size=settings.db_query_cache_size,
+    connect_args=connect_args
 )
 
 # Session factory for creating database sessions
 # expire_on_commit=False prevents objects from being expired after commit,
 # allowing continued access to their attributes without re-querying
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# autoflush=False stops queries from flushing pending changes first; handlers
+# commit explicitly and never read back objects they have just added
+async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+# Maximum number of pooled connections read_rows() calls may hold at once, so
+# summary endpoints that run their queries in parallel cannot drain the pool
+READ_QUERY_CONCURRENCY = 6
+_read_query_slots = asyncio.Semaphore(READ_QUERY_CONCURRENCY)
 
 # Base class for all SQLAlchemy ORM models
 # All model classes should inherit from this Base
@@ -57,3 +93,90 @@ async def get_db():
     """
     async with async_session() as session:
         yield session
+
+
+@asynccontextmanager
+async def readonly_session():
+    """
+    Open a session whose transaction is started as READ ONLY.
+
+    PostgreSQL can skip write bookkeeping for it, and any write attempted
+    through the session fails.
+
+    Yields:
+        AsyncSession: Read-only database session
+    """
+    async with async_session() as session:
+        await session.execute(text("SET TRANSACTION READ ONLY"))
+        yield session
+
+
+async def get_readonly_db():
+    """
+    Dependency injection function for read-only database sessions.
+
+    Same as get_db(), but the session comes from readonly_session(). Used by
+    GET endpoints.
+
+    Yields:
+        AsyncSession: Read-only database session for the current request
+    """
+    async with readonly_session() as session:
+        yield session
+
+
+async def read_rows(stmt) -> list:
+    """
+    Run one read-only query on its own pooled session and return its rows.
+
+    Independent summary queries each take a separate connection so the
+    database can work on them concurrently (asyncio.gather over read_rows
+    calls); READ_QUERY_CONCURRENCY caps how many connections these queries
+    hold at once across all endpoints.
+
+    Args:
+        stmt: SELECT statement to run
+
+    Returns:
+        The result rows as mappings
+    """
+    async with _read_query_slots:
+        async with readonly_session() as session:
+            result = await session.execute(stmt)
+            return result.mappings().all()
+
+
+def create_extensions(connection) -> None:
+    """
+    Enable PostgreSQL extensions required by the model indexes.
+
+    pg_trgm provides the gin_trgm_ops operator class used by trigram indexes
+    on text search columns, so it must exist before the indexes are created.
+
+    Only called from init_db.py (database/init.sql does the same for new
+    Docker databases): concurrent app workers would race on the same DDL, and
+    the app's role may not be allowed to create extensions.
+
+    Args:
+        connection: Synchronous connection (use with AsyncConnection.run_sync)
+    """
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def create_missing_indexes(connection) -> None:
+    """
+    Create indexes declared on the models that do not exist yet.
+
+    Base.metadata.create_all() only creates indexes together with a new table,
+    so indexes added to a model later would never reach an existing database.
+    Each index is checked first and only created when missing.
+
+    Only called from init_db.py: building an index blocks writes to its table,
+    and concurrent app workers would race on the same CREATE INDEX.
+
+    Args:
+        connection: Synchronous connection (use with AsyncConnection.run_sync)
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
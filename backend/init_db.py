@@ -1,12 +1,18 @@
 import asyncio
-from database import Base, engine
+from database import Base, engine, create_extensions, create_missing_indexes
 from models import Room, Booking, BookingService, Expense, Guest
 
 async def init_database():
     """Initialize database tables"""
     async with engine.begin() as conn:
+        # Extensions must exist before the indexes that depend on them; like
+        # the indexes below, they are created here and not at app startup
+        await conn.run_sync(create_extensions)
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        # Add indexes declared after a table was first created. This runs only
+        # here, not at app startup, so a single process builds them
+        await conn.run_sync(create_missing_indexes)
         print("Database tables created successfully!")
 
 if __name__ == "__main__":
@@ -20,6 +20,7 @@ from routes.expenses import router as expenses_router
 from routes.guests import router as guests_router
 from routes.event_bookings import router as event_bookings_router
 from database import Base, engine
+from services.auth import shutdown_bcrypt_pool
 import models  # Import to register all models with SQLAlchemy's metadata
 
 # Initialize the FastAPI application instance
@@ -38,6 +39,9 @@ async def startup_event():
     Application startup event handler.
 
     Creates all database tables defined in SQLAlchemy models if they don't exist.
+    Extensions and indexes added to existing tables are not created here,
+    since every worker runs this hook; database/init.sql and init_db.py
+    create them once.
     This ensures the database schema is always in sync with the application models.
     Uses async connection for non-blocking database initialization.
     """
@@ -47,6 +51,15 @@ async def startup_event():
         await conn.run_sync(Base.metadata.create_all)
     print("Database tables initialized successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Application shutdown event handler.
+
+    Stops the bcrypt worker processes so none outlive the app worker.
+    """
+    shutdown_bcrypt_pool()
+
 # =============================================================================
 # CORS (Cross-Origin Resource Sharing) Configuration
 # =============================================================================
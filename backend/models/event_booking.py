@@ -5,7 +5,7 @@ This module defines the data models for event bookings (weddings, corporate even
 with dual-track financial management - tracking both customer revenue and vendor expenses.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Date, Index, text
 from sqlalchemy.types import Enum
 from sqlalchemy.orm import relationship
 from database import Base
@@ -85,6 +85,19 @@ class EventBooking(Base):
     services = relationship("EventService", back_populates="event_booking", cascade="all, delete-orphan")
     customer_payments = relationship("EventCustomerPayment", back_populates="event_booking", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Matches the list ordering (newest first) and date range filters
+        Index("idx_event_booking_date_id", booking_date.desc(), id.desc()),
+        # Partial index for the summary, which excludes cancelled events
+        Index("idx_event_booking_status", status, postgresql_where=text("status != 'CANCELLED'")),
+        # Trigram index so the ILIKE '%term%' search is not a sequential scan
+        Index(
+            "idx_event_booking_name_trgm", booking_name, contact_name,
+            postgresql_using="gin",
+            postgresql_ops={"booking_name": "gin_trgm_ops", "contact_name": "gin_trgm_ops"}
+        ),
+    )
+
 
 class EventService(Base):
     """
@@ -116,6 +129,10 @@ class EventService(Base):
     event_booking = relationship("EventBooking", back_populates="services")
     vendor_payments = relationship("EventVendorPayment", back_populates="service", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("idx_event_service_booking", event_booking_id),
+    )
+
 
 class EventCustomerPayment(Base):
     """
@@ -137,6 +154,10 @@ class EventCustomerPayment(Base):
 
     event_booking = relationship("EventBooking", back_populates="customer_payments")
 
+    __table_args__ = (
+        Index("idx_event_cust_pay_booking", event_booking_id),
+    )
+
 
 class EventVendorPayment(Base):
     """
@@ -158,6 +179,10 @@ class EventVendorPayment(Base):
 
     service = relationship("EventService", back_populates="vendor_payments")
 
+    __table_args__ = (
+        Index("idx_event_vendor_pay_service", event_service_id),
+    )
+
 
 # =============================================================================
 # PYDANTIC SCHEMAS - PAYMENTS
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Date, Index, text
 from sqlalchemy.types import Enum
 from database import Base
 from datetime import datetime, date
@@ -74,6 +74,18 @@ class Expense(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Date ordering for lists and range scans for summaries and trends
+        Index("ix_expense_date_desc", expense_date.desc()),
+        # Status filter combined with a date range or date ordering
+        Index("ix_expense_status_date", status, expense_date.desc()),
+        # Overdue lookup only ever scans pending expenses with a due date
+        Index("ix_expense_pending_due", due_date, postgresql_where=text("status = 'PENDING'")),
+        # Trigram indexes so ILIKE '%term%' searches are not sequential scans
+        Index("ix_expense_vendor_name_trgm", vendor_name, postgresql_using="gin", postgresql_ops={"vendor_name": "gin_trgm_ops"}),
+        Index("ix_expense_employee_name_trgm", employee_name, postgresql_using="gin", postgresql_ops={"employee_name": "gin_trgm_ops"}),
+    )
+
 # Pydantic models for API
 from pydantic import BaseModel, Field, validator
 from typing import Optional
@@ -203,6 +215,9 @@ class ExpenseListResponse(BaseModel):
     vendor_name: Optional[str]
     created_at: dt
 
+    class Config:
+        from_attributes = True
+
 class ExpenseSummary(BaseModel):
     """Summary stats for expenses"""
     total_amount: float
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, DateTime, Text, Date, Index
 from database import Base
 from datetime import datetime, date
 
@@ -9,7 +9,7 @@ class Guest(Base):
 
     # Personal Information
     full_name = Column(String(200), nullable=False)
-    phone = Column(String(20), nullable=False, index=True)
+    phone = Column(String(20), nullable=False, unique=True, index=True)
     email = Column(String(200), nullable=True, index=True)
     id_proof_type = Column(String(50), nullable=True)  # Aadhar, Passport, etc.
     id_proof_number = Column(String(50), nullable=True)
@@ -35,6 +35,15 @@ class Guest(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Matches the guest list ordering (most recent visit first)
+        Index("ix_guest_last_visit", last_visit.desc().nulls_last()),
+        # Trigram indexes so ILIKE '%term%' searches are not sequential scans
+        Index("ix_guest_full_name_trgm", full_name, postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_guest_phone_trgm", phone, postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"}),
+        Index("ix_guest_email_trgm", email, postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
+
 # Pydantic models for API
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
@@ -110,6 +119,9 @@ class GuestListResponse(BaseModel):
     total_spent: float
     last_visit: Optional[date_type]
 
+    class Config:
+        from_attributes = True
+
 class GuestSearchFilters(BaseModel):
     full_name: Optional[str] = None
     phone: Optional[str] = None
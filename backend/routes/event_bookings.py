@@ -5,13 +5,19 @@ This module provides all API endpoints for managing event bookings,
 including CRUD operations, service management, and payment collection.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import hashlib
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, delete, func, case, literal, and_, or_
 from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-from database import get_db
+from database import get_db, read_rows
+from services.cache import DataVersion, ResponseCache
+from services.listing import STREAM_THRESHOLD, STREAM_CHUNK_SIZE
 from models.event_booking import (
     EventBooking, EventService, EventCustomerPayment, EventVendorPayment,
     EventBookingCreate, EventBookingUpdate, EventBookingResponse, EventBookingListResponse,
@@ -23,11 +29,56 @@ from models.event_booking import (
 
 router = APIRouter()
 
+# Loader options shared by every endpoint that returns full details. Building
+# them once keeps the statements identical between requests, so SQLAlchemy's
+# compiled-statement cache hits instead of recompiling each option chain.
+_FULL_EVENT_OPTIONS = (
+    selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
+    selectinload(EventBooking.customer_payments)
+)
+_SERVICE_OPTIONS = (selectinload(EventService.vendor_payments),)
+
+# Serializer for list pages, built once at import
+_EVENT_LIST_ADAPTER = TypeAdapter(List[EventBookingListResponse])
+
+# Write counter for event bookings and their services and payments, shared by
+# every worker process
+_event_data_version = DataVersion("event_bookings")
+
+# Assembled summaries, keyed by (date_from, date_to). Reports poll the summary
+# far more often than events change, so results are kept briefly; every write
+# bumps _event_data_version, so no worker serves a summary from before it.
+_summary_cache = ResponseCache(_event_data_version, maxsize=256, ttl=30)
+
 
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
+async def _invalidate_event_caches(db: AsyncSession) -> None:
+    """Make cached summaries unreachable, in all workers, after a committed write"""
+    await _event_data_version.bump(db)
+
+
+def _request_etag(request: Request, version: int) -> str:
+    """
+    Tag a GET by the shared event data version and the request it answers.
+
+    The version is the same in every worker and survives restarts, so the tag
+    is known before any query runs. Today's date is part of it because list
+    items are collapsed by comparing booking dates with the current date.
+    """
+    key = f"{version}|{date.today()}|{request.url.path}|{request.url.query}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=8).hexdigest() + '"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 when the client's If-None-Match already holds etag"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
 def compute_event_financials(event_booking: EventBooking) -> dict:
     """
     Compute financial summary for an event booking.
@@ -61,11 +112,14 @@ def compute_event_financials(event_booking: EventBooking) -> dict:
     }
 
 
-def is_collapsed(booking_date: date) -> bool:
-    """Check if event should be auto-collapsed (> 3 days old)"""
-    today = date.today()
-    diff_days = (today - booking_date).days
-    return diff_days > 3
+# Events dated more than this many days ago are auto-collapsed in list views
+COLLAPSE_AFTER_DAYS = 3
+
+# Computed by the database per row, so list views need no Python date math
+is_collapsed_column = case(
+    (EventBooking.booking_date < func.current_date() - COLLAPSE_AFTER_DAYS, True),
+    else_=False
+).label("is_collapsed")
 
 
 def build_service_response(service: EventService) -> EventServiceResponse:
@@ -126,6 +180,29 @@ def build_event_response(event: EventBooking) -> EventBookingResponse:
     )
 
 
+def build_list_item(event: EventBooking, collapsed: bool) -> EventBookingListResponse:
+    """Build list view response for an event loaded with services and payments"""
+    financials = compute_event_financials(event)
+
+    # Values come straight from typed ORM columns, so skip re-validation
+    return EventBookingListResponse.model_construct(
+        id=event.id,
+        booking_name=event.booking_name,
+        booking_date=event.booking_date,
+        contact_name=event.contact_name,
+        contact_phone=event.contact_phone,
+        status=event.status,
+        total_customer_price=financials["total_customer_price"],
+        total_collected=financials["total_collected"],
+        customer_pending=financials["customer_pending"],
+        total_vendor_cost=financials["total_vendor_cost"],
+        total_vendor_paid=financials["total_vendor_paid"],
+        vendor_pending=financials["vendor_pending"],
+        created_at=event.created_at,
+        is_collapsed=collapsed
+    )
+
+
 # =============================================================================
 # EVENT BOOKING CRUD ENDPOINTS
 # =============================================================================
@@ -164,14 +241,12 @@ async def create_event_booking(
         db.add(service)
 
     await db.commit()
+    await _invalidate_event_caches(db)
 
     # Reload with relationships
     result = await db.execute(
         select(EventBooking)
-        .options(
-            selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-            selectinload(EventBooking.customer_payments)
-        )
+        .options(*_FULL_EVENT_OPTIONS)
         .where(EventBooking.id == event.id)
     )
     event = result.scalar_one()
@@ -180,7 +255,9 @@ async def create_event_booking(
 
 
 @router.get("/", response_model=List[EventBookingListResponse])
+@router.head("/", include_in_schema=False)
 async def list_event_bookings(
+    request: Request,
     search: Optional[str] = Query(None, description="Search by booking name or contact name"),
     status: Optional[EventBookingStatusEnum] = None,
     date_from: Optional[date] = None,
@@ -189,19 +266,29 @@ async def list_event_bookings(
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of event bookings with optional filters"""
-    query = select(EventBooking).options(
-        selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-        selectinload(EventBooking.customer_payments)
-    )
+    """
+    Get list of event bookings with optional filters.
+
+    The page is tagged with an ETag of the event data version, so a client
+    whose copy is still current gets a 304 without the list being queried.
+    """
+    version = await _event_data_version.current()
+    etag = _request_etag(request, version)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    query = select(EventBooking, is_collapsed_column).options(*_FULL_EVENT_OPTIONS)
 
     filters = []
 
     if search:
+        # Substring match, served by the trigram indexes on both name columns
+        pattern = f"%{search}%"
         filters.append(
             or_(
-                EventBooking.booking_name.ilike(f"%{search}%"),
-                EventBooking.contact_name.ilike(f"%{search}%")
+                EventBooking.booking_name.ilike(pattern),
+                EventBooking.contact_name.ilike(pattern)
             )
         )
 
@@ -217,93 +304,85 @@ async def list_event_bookings(
     if filters:
         query = query.where(and_(*filters))
 
-    query = query.order_by(EventBooking.booking_date.desc()).offset(skip).limit(limit)
-
-    result = await db.execute(query)
-    events = result.scalars().all()
-
-    response = []
-    for event in events:
-        financials = compute_event_financials(event)
-        response.append(EventBookingListResponse(
-            id=event.id,
-            booking_name=event.booking_name,
-            booking_date=event.booking_date,
-            contact_name=event.contact_name,
-            contact_phone=event.contact_phone,
-            status=event.status,
-            total_customer_price=financials["total_customer_price"],
-            total_collected=financials["total_collected"],
-            customer_pending=financials["customer_pending"],
-            total_vendor_cost=financials["total_vendor_cost"],
-            total_vendor_paid=financials["total_vendor_paid"],
-            vendor_pending=financials["vendor_pending"],
-            created_at=event.created_at,
-            is_collapsed=is_collapsed(event.booking_date)
-        ))
-
-    return response
+    query = query.order_by(EventBooking.booking_date.desc(), EventBooking.id.desc()).offset(skip).limit(limit)
 
+    if limit > STREAM_THRESHOLD:
+        # Large pages are fetched in chunks, so only STREAM_CHUNK_SIZE fully
+        # loaded bookings are held in memory at a time
+        result = await db.stream(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        items = [build_list_item(event, collapsed) async for event, collapsed in result]
+    else:
+        result = await db.execute(query)
+        items = [build_list_item(event, collapsed) for event, collapsed in result.all()]
 
-@router.get("/summary", response_model=EventBookingSummary)
-async def get_event_bookings_summary(
-    date_from: Optional[date] = Query(None),
-    date_to: Optional[date] = Query(None),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get financial summary of event bookings for reports"""
-    query = select(EventBooking).options(
-        selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-        selectinload(EventBooking.customer_payments)
-    )
+    return Response(_EVENT_LIST_ADAPTER.dump_json(items), media_type="application/json", headers={"ETag": etag})
 
-    filters = []
+
+async def compute_event_bookings_summary(date_from: Optional[date], date_to: Optional[date]) -> dict:
+    """
+    Compute the event bookings summary as a plain dict.
+
+    Status counts and financial totals are two independent aggregate queries,
+    so each runs through read_rows() on its own read-only session and the
+    database works on them concurrently.
+    """
+    date_filters = []
     if date_from:
-        filters.append(EventBooking.booking_date >= date_from)
+        date_filters.append(EventBooking.booking_date >= date_from)
     if date_to:
-        filters.append(EventBooking.booking_date <= date_to)
+        date_filters.append(EventBooking.booking_date <= date_to)
 
     # Exclude cancelled from financial calculations
-    filters.append(EventBooking.status != EventBookingStatusEnum.CANCELLED)
+    active_booking_ids = select(EventBooking.id).where(
+        *date_filters,
+        EventBooking.status != EventBookingStatusEnum.CANCELLED
+    )
 
-    if filters:
-        query = query.where(and_(*filters))
+    # Count by status (including cancelled for total count) in one pass
+    counts_stmt = select(
+        func.count().label('total'),
+        func.count().filter(EventBooking.status == EventBookingStatusEnum.CONFIRMED).label('confirmed'),
+        func.count().filter(EventBooking.status == EventBookingStatusEnum.COMPLETED).label('completed'),
+        func.count().filter(EventBooking.status == EventBookingStatusEnum.CANCELLED).label('cancelled')
+    ).select_from(EventBooking).where(*date_filters)
+
+    # Each table is summed in its own subquery so that joining one table
+    # does not multiply the rows of another
+    revenue = select(func.coalesce(func.sum(EventService.customer_price), 0.0)).where(
+        EventService.event_booking_id.in_(active_booking_ids)
+    ).scalar_subquery()
+    collected = select(func.coalesce(func.sum(EventCustomerPayment.amount), 0.0)).where(
+        EventCustomerPayment.event_booking_id.in_(active_booking_ids)
+    ).scalar_subquery()
+    vendor_cost = select(func.coalesce(func.sum(EventService.vendor_cost), 0.0)).where(
+        EventService.event_booking_id.in_(active_booking_ids)
+    ).scalar_subquery()
+    vendor_paid = select(func.coalesce(func.sum(EventVendorPayment.amount), 0.0)).select_from(
+        EventVendorPayment
+    ).join(EventService).where(
+        EventService.event_booking_id.in_(active_booking_ids)
+    ).scalar_subquery()
+    financials_stmt = select(
+        revenue.label('revenue'),
+        collected.label('collected'),
+        vendor_cost.label('vendor_cost'),
+        vendor_paid.label('vendor_paid')
+    )
 
-    result = await db.execute(query)
-    events = result.scalars().all()
+    count_rows, financial_rows = await asyncio.gather(read_rows(counts_stmt), read_rows(financials_stmt))
 
-    # Count by status (including cancelled for total count)
-    status_query = select(EventBooking)
-    if date_from:
-        status_query = status_query.where(EventBooking.booking_date >= date_from)
-    if date_to:
-        status_query = status_query.where(EventBooking.booking_date <= date_to)
-
-    status_result = await db.execute(status_query)
-    all_events = status_result.scalars().all()
-
-    confirmed = sum(1 for e in all_events if e.status == EventBookingStatusEnum.CONFIRMED)
-    completed = sum(1 for e in all_events if e.status == EventBookingStatusEnum.COMPLETED)
-    cancelled = sum(1 for e in all_events if e.status == EventBookingStatusEnum.CANCELLED)
-
-    # Calculate financials
-    total_revenue = 0.0
-    total_collected = 0.0
-    total_expenses = 0.0
-    total_paid = 0.0
-
-    for event in events:
-        financials = compute_event_financials(event)
-        total_revenue += financials["total_customer_price"]
-        total_collected += financials["total_collected"]
-        total_expenses += financials["total_vendor_cost"]
-        total_paid += financials["total_vendor_paid"]
-
-    return EventBookingSummary(
-        total_events=len(all_events),
-        confirmed_events=confirmed,
-        completed_events=completed,
-        cancelled_events=cancelled,
+    counts = count_rows[0]
+    financials = financial_rows[0]
+    total_revenue = float(financials['revenue'])
+    total_collected = float(financials['collected'])
+    total_expenses = float(financials['vendor_cost'])
+    total_paid = float(financials['vendor_paid'])
+
+    summary = EventBookingSummary(
+        total_events=counts['total'],
+        confirmed_events=counts['confirmed'],
+        completed_events=counts['completed'],
+        cancelled_events=counts['cancelled'],
         total_revenue=total_revenue,
         total_collected=total_collected,
         revenue_pending=total_revenue - total_collected,
@@ -311,8 +390,38 @@ async def get_event_bookings_summary(
         total_paid=total_paid,
         expenses_pending=total_expenses - total_paid,
         total_profit=total_revenue - total_expenses
+    ).model_dump()
+    return summary
+
+
+@router.get("/summary", response_model=EventBookingSummary)
+@router.head("/summary", include_in_schema=False)
+async def get_event_bookings_summary(
+    request: Request,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None)
+):
+    """
+    Get financial summary of event bookings for reports.
+
+    The assembled summary is served from _summary_cache until the next write,
+    and clients whose ETag matches the event data version get a 304 without
+    the summary being looked up.
+    """
+    version = await _event_data_version.current()
+    etag = _request_etag(request, version)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    summary = await _summary_cache.get_or_compute(
+        (date_from, date_to),
+        lambda: compute_event_bookings_summary(date_from, date_to),
+        version=version
     )
 
+    return Response(orjson.dumps(summary), media_type="application/json", headers={"ETag": etag})
+
 
 @router.get("/{event_id}", response_model=EventBookingResponse)
 async def get_event_booking(
@@ -322,10 +431,7 @@ async def get_event_booking(
     """Get single event booking with all details"""
     result = await db.execute(
         select(EventBooking)
-        .options(
-            selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-            selectinload(EventBooking.customer_payments)
-        )
+        .options(*_FULL_EVENT_OPTIONS)
         .where(EventBooking.id == event_id)
     )
     event = result.scalar_one_or_none()
@@ -343,38 +449,34 @@ async def update_event_booking(
     db: AsyncSession = Depends(get_db)
 ):
     """Update event booking basic information"""
+    # Update fields that were provided in a single UPDATE ... RETURNING,
+    # which also tells us whether the booking exists
+    update_data = event_data.dict(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(EventBooking)
+            .where(EventBooking.id == event_id)
+            .values(**update_data)
+            .returning(EventBooking.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Event booking not found")
+
+        await db.commit()
+        await _invalidate_event_caches(db)
+
+    # Load with relationships for the response
     result = await db.execute(
         select(EventBooking)
-        .options(
-            selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-            selectinload(EventBooking.customer_payments)
-        )
+        .options(*_FULL_EVENT_OPTIONS)
         .where(EventBooking.id == event_id)
+        .execution_options(populate_existing=True)
     )
     event = result.scalar_one_or_none()
 
     if not event:
         raise HTTPException(status_code=404, detail="Event booking not found")
 
-    # Update fields that were provided
-    update_data = event_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(event, field, value)
-
-    await db.commit()
-    await db.refresh(event)
-
-    # Reload with relationships
-    result = await db.execute(
-        select(EventBooking)
-        .options(
-            selectinload(EventBooking.services).selectinload(EventService.vendor_payments),
-            selectinload(EventBooking.customer_payments)
-        )
-        .where(EventBooking.id == event_id)
-    )
-    event = result.scalar_one()
-
     return build_event_response(event)
 
 
@@ -384,22 +486,51 @@ async def delete_event_booking(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete event booking (only if cancelled)"""
-    result = await db.execute(
-        select(EventBooking).where(EventBooking.id == event_id)
+    # Every statement is guarded by the cancelled-status check, so nothing is
+    # removed for a booking that is missing or still active. Child rows are
+    # deleted explicitly because the foreign keys do not cascade in the database.
+    cancelled_id = select(EventBooking.id).where(
+        and_(
+            EventBooking.id == event_id,
+            EventBooking.status == EventBookingStatusEnum.CANCELLED
+        )
     )
-    event = result.scalar_one_or_none()
+    service_ids = select(EventService.id).where(EventService.event_booking_id.in_(cancelled_id))
 
-    if not event:
-        raise HTTPException(status_code=404, detail="Event booking not found")
+    await db.execute(
+        delete(EventVendorPayment).where(EventVendorPayment.event_service_id.in_(service_ids))
+    )
+    await db.execute(
+        delete(EventService).where(EventService.event_booking_id.in_(cancelled_id))
+    )
+    await db.execute(
+        delete(EventCustomerPayment).where(EventCustomerPayment.event_booking_id.in_(cancelled_id))
+    )
+    result = await db.execute(
+        delete(EventBooking)
+        .where(
+            and_(
+                EventBooking.id == event_id,
+                EventBooking.status == EventBookingStatusEnum.CANCELLED
+            )
+        )
+        .returning(EventBooking.id)
+    )
 
-    if event.status != EventBookingStatusEnum.CANCELLED:
+    if result.scalar_one_or_none() is None:
+        # Rare failure path: tell a missing booking apart from an active one
+        exists_result = await db.execute(
+            select(literal(1)).where(EventBooking.id == event_id)
+        )
+        if exists_result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Event booking not found")
         raise HTTPException(
             status_code=400,
             detail="Only cancelled events can be deleted"
         )
 
-    await db.delete(event)
     await db.commit()
+    await _invalidate_event_caches(db)
 
     return {"message": "Event booking deleted successfully"}
 
@@ -415,15 +546,16 @@ async def add_service(
     db: AsyncSession = Depends(get_db)
 ):
     """Add a service to an event booking"""
+    # Only the status is needed, so skip loading the full booking
     result = await db.execute(
-        select(EventBooking).where(EventBooking.id == event_id)
+        select(EventBooking.status).where(EventBooking.id == event_id)
     )
-    event = result.scalar_one_or_none()
+    event_status = result.scalar_one_or_none()
 
-    if not event:
+    if event_status is None:
         raise HTTPException(status_code=404, detail="Event booking not found")
 
-    if event.status == EventBookingStatusEnum.CANCELLED:
+    if event_status == EventBookingStatusEnum.CANCELLED:
         raise HTTPException(status_code=400, detail="Cannot add services to cancelled events")
 
     service = EventService(
@@ -438,12 +570,13 @@ async def add_service(
 
     db.add(service)
     await db.commit()
+    await _invalidate_event_caches(db)
     await db.refresh(service)
 
     # Load vendor_payments relationship
     result = await db.execute(
         select(EventService)
-        .options(selectinload(EventService.vendor_payments))
+        .options(*_SERVICE_OPTIONS)
         .where(EventService.id == service.id)
     )
     service = result.scalar_one()
@@ -459,37 +592,44 @@ async def update_service(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a service's pricing or details"""
+    # Update fields that were provided in a single UPDATE ... RETURNING,
+    # which also tells us whether the service exists
+    update_data = service_data.dict(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(EventService)
+            .where(
+                and_(
+                    EventService.id == service_id,
+                    EventService.event_booking_id == event_id
+                )
+            )
+            .values(**update_data)
+            .returning(EventService.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+
+        await db.commit()
+        await _invalidate_event_caches(db)
+
+    # Load with relationships for the response
     result = await db.execute(
         select(EventService)
-        .options(selectinload(EventService.vendor_payments))
+        .options(*_SERVICE_OPTIONS)
         .where(
             and_(
                 EventService.id == service_id,
                 EventService.event_booking_id == event_id
             )
         )
+        .execution_options(populate_existing=True)
     )
     service = result.scalar_one_or_none()
 
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    # Update fields that were provided
-    update_data = service_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(service, field, value)
-
-    await db.commit()
-    await db.refresh(service)
-
-    # Reload with relationships
-    result = await db.execute(
-        select(EventService)
-        .options(selectinload(EventService.vendor_payments))
-        .where(EventService.id == service_id)
-    )
-    service = result.scalar_one()
-
     return build_service_response(service)
 
 
@@ -500,21 +640,27 @@ async def delete_service(
     db: AsyncSession = Depends(get_db)
 ):
     """Remove a service from an event booking"""
-    result = await db.execute(
-        select(EventService).where(
-            and_(
-                EventService.id == service_id,
-                EventService.event_booking_id == event_id
-            )
+    service_match = and_(
+        EventService.id == service_id,
+        EventService.event_booking_id == event_id
+    )
+
+    # Vendor payments do not cascade in the database, so remove them first;
+    # the subquery keeps this a no-op when the service is not on this event
+    await db.execute(
+        delete(EventVendorPayment).where(
+            EventVendorPayment.event_service_id.in_(select(EventService.id).where(service_match))
         )
     )
-    service = result.scalar_one_or_none()
+    result = await db.execute(
+        delete(EventService).where(service_match).returning(EventService.id)
+    )
 
-    if not service:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    await db.delete(service)
     await db.commit()
+    await _invalidate_event_caches(db)
 
     return {"message": "Service removed successfully"}
 
@@ -530,15 +676,16 @@ async def add_customer_payment(
     db: AsyncSession = Depends(get_db)
 ):
     """Record a customer payment for an event"""
+    # Only the status is needed, so skip loading the full booking
     result = await db.execute(
-        select(EventBooking).where(EventBooking.id == event_id)
+        select(EventBooking.status).where(EventBooking.id == event_id)
     )
-    event = result.scalar_one_or_none()
+    event_status = result.scalar_one_or_none()
 
-    if not event:
+    if event_status is None:
         raise HTTPException(status_code=404, detail="Event booking not found")
 
-    if event.status == EventBookingStatusEnum.CANCELLED:
+    if event_status == EventBookingStatusEnum.CANCELLED:
         raise HTTPException(status_code=400, detail="Cannot add payments to cancelled events")
 
     payment = EventCustomerPayment(
@@ -551,6 +698,7 @@ async def add_customer_payment(
 
     db.add(payment)
     await db.commit()
+    await _invalidate_event_caches(db)
     await db.refresh(payment)
 
     return EventCustomerPaymentResponse(
@@ -571,20 +719,21 @@ async def delete_customer_payment(
 ):
     """Remove a customer payment"""
     result = await db.execute(
-        select(EventCustomerPayment).where(
+        delete(EventCustomerPayment)
+        .where(
             and_(
                 EventCustomerPayment.id == payment_id,
                 EventCustomerPayment.event_booking_id == event_id
             )
         )
+        .returning(EventCustomerPayment.id)
     )
-    payment = result.scalar_one_or_none()
 
-    if not payment:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Payment not found")
 
-    await db.delete(payment)
     await db.commit()
+    await _invalidate_event_caches(db)
 
     return {"message": "Payment removed successfully"}
 
@@ -603,16 +752,15 @@ async def add_vendor_payment(
     """Record a vendor payment for a specific service"""
     # Verify service belongs to the event
     result = await db.execute(
-        select(EventService).where(
+        select(literal(1)).where(
             and_(
                 EventService.id == service_id,
                 EventService.event_booking_id == event_id
             )
-        )
+        ).limit(1)
     )
-    service = result.scalar_one_or_none()
 
-    if not service:
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="Service not found")
 
     payment = EventVendorPayment(
@@ -625,6 +773,7 @@ async def add_vendor_payment(
 
     db.add(payment)
     await db.commit()
+    await _invalidate_event_caches(db)
     await db.refresh(payment)
 
     return EventVendorPaymentResponse(
@@ -646,23 +795,27 @@ async def delete_vendor_payment(
 ):
     """Remove a vendor payment"""
     # Verify the payment belongs to the correct service and event
+    event_service = select(EventService.id).where(
+        and_(
+            EventService.id == service_id,
+            EventService.event_booking_id == event_id
+        )
+    )
     result = await db.execute(
-        select(EventVendorPayment)
-        .join(EventService)
+        delete(EventVendorPayment)
         .where(
             and_(
                 EventVendorPayment.id == payment_id,
-                EventVendorPayment.event_service_id == service_id,
-                EventService.event_booking_id == event_id
+                EventVendorPayment.event_service_id.in_(event_service)
             )
         )
+        .returning(EventVendorPayment.id)
     )
-    payment = result.scalar_one_or_none()
 
-    if not payment:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Payment not found")
 
-    await db.delete(payment)
     await db.commit()
+    await _invalidate_event_caches(db)
 
     return {"message": "Vendor payment removed successfully"}
@@ -1,9 +1,14 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, text, extract
+from sqlalchemy import select, update, delete, func, case, cast, literal, any_, and_, or_, text, extract, Integer, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+from pydantic import TypeAdapter
 from typing import List, Optional, Dict
-from datetime import datetime, date, timedelta
-from database import get_db
+from datetime import datetime, date
+from database import get_db, get_readonly_db, read_rows
+from services.cache import DataVersion, ResponseCache
+from services.listing import fetch_page, ordered_filters
 from models.expense import (
     Expense, ExpenseCreate, ExpenseUpdate, ExpenseResponse,
     ExpenseListResponse, ExpenseSummary, ExpenseSearchFilters,
@@ -12,6 +17,22 @@ from models.expense import (
 
 router = APIRouter()
 
+_EXPENSE_LIST_ADAPTER = TypeAdapter(List[ExpenseListResponse])
+
+# Summary and breakdown results, keyed by endpoint and query parameters.
+# Dashboards poll these far more often than expenses change; every write
+# bumps the shared expenses version, so no worker serves results from before it.
+_report_cache = ResponseCache(DataVersion("expenses"), maxsize=64, ttl=30)
+
+# Order in which list filters are applied: equality on indexed columns first,
+# then ranges, then substring matches that cannot use a btree index
+_EXPENSE_FILTER_PRIORITY = {
+    'category': 0, 'status': 0,
+    'date_from': 1, 'date_to': 1,
+    'amount_min': 2, 'amount_max': 2,
+    'vendor_name': 3, 'employee_name': 3,
+}
+
 @router.post("/", response_model=ExpenseResponse, status_code=201)
 async def create_expense(
     expense_data: ExpenseCreate,
@@ -41,6 +62,7 @@ async def create_expense(
         expense = Expense(**data)
         db.add(expense)
         await db.commit()
+        await _report_cache.invalidate(db)
         await db.refresh(expense)
 
         return expense
@@ -60,75 +82,65 @@ async def list_expenses(
     amount_max: Optional[float] = Query(None, ge=0),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Get list of expenses with optional filters"""
-    query = select(Expense)
+    # Only the list view columns are selected, and amount_due is computed
+    # by the database: for pending expenses it is recalculated from amount and
+    # amount_paid (handles rows where amount_due wasn't properly set),
+    # otherwise the stored value is used
+    query = select(
+        Expense.id,
+        Expense.category,
+        Expense.description,
+        Expense.amount,
+        func.coalesce(Expense.amount_paid, 0.0).label('amount_paid'),
+        case(
+            (Expense.status == ExpenseStatusEnum.PENDING,
+             func.greatest(Expense.amount - func.coalesce(Expense.amount_paid, 0.0), 0.0)),
+            else_=func.coalesce(Expense.amount_due, 0.0)
+        ).label('amount_due'),
+        Expense.expense_date,
+        Expense.status,
+        Expense.vendor_name,
+        Expense.created_at
+    )
 
+    # Paired bounds collapse into a single BETWEEN range
     filters = []
     if category:
-        filters.append(Expense.category == category)
+        filters.append((_EXPENSE_FILTER_PRIORITY['category'], Expense.category == category))
     if status:
-        filters.append(Expense.status == status)
+        filters.append((_EXPENSE_FILTER_PRIORITY['status'], Expense.status == status))
     if vendor_name:
-        filters.append(Expense.vendor_name.ilike(f"%{vendor_name}%"))
+        filters.append((_EXPENSE_FILTER_PRIORITY['vendor_name'], Expense.vendor_name.ilike(f"%{vendor_name}%")))
     if employee_name:
-        filters.append(Expense.employee_name.ilike(f"%{employee_name}%"))
-    if date_from:
-        filters.append(Expense.expense_date >= date_from)
-    if date_to:
-        filters.append(Expense.expense_date <= date_to)
-    if amount_min is not None:
-        filters.append(Expense.amount >= amount_min)
-    if amount_max is not None:
-        filters.append(Expense.amount <= amount_max)
+        filters.append((_EXPENSE_FILTER_PRIORITY['employee_name'], Expense.employee_name.ilike(f"%{employee_name}%")))
+    if date_from and date_to:
+        filters.append((_EXPENSE_FILTER_PRIORITY['date_from'], Expense.expense_date.between(date_from, date_to)))
+    elif date_from:
+        filters.append((_EXPENSE_FILTER_PRIORITY['date_from'], Expense.expense_date >= date_from))
+    elif date_to:
+        filters.append((_EXPENSE_FILTER_PRIORITY['date_to'], Expense.expense_date <= date_to))
+    if amount_min is not None and amount_max is not None:
+        filters.append((_EXPENSE_FILTER_PRIORITY['amount_min'], Expense.amount.between(amount_min, amount_max)))
+    elif amount_min is not None:
+        filters.append((_EXPENSE_FILTER_PRIORITY['amount_min'], Expense.amount >= amount_min))
+    elif amount_max is not None:
+        filters.append((_EXPENSE_FILTER_PRIORITY['amount_max'], Expense.amount <= amount_max))
 
     if filters:
-        query = query.where(and_(*filters))
+        query = query.where(ordered_filters(filters))
 
     query = query.order_by(Expense.expense_date.desc()).offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    expenses = result.scalars().all()
-
-    # Convert to list response format
-    expense_list = []
-    for expense in expenses:
-        # Calculate amount_due dynamically to ensure accuracy
-        # This handles cases where amount_due wasn't properly set
-        amount_paid = expense.amount_paid or 0.0
-        calculated_amount_due = expense.amount - amount_paid
-
-        # Use the stored amount_due if it's set, otherwise use calculated
-        # For unpaid expenses (Pending status), recalculate to ensure correctness
-        if expense.status == ExpenseStatusEnum.PENDING:
-            amount_due = calculated_amount_due if calculated_amount_due > 0 else 0.0
-        else:
-            amount_due = expense.amount_due if expense.amount_due is not None else 0.0
-
-        expense_item = ExpenseListResponse(
-            id=expense.id,
-            category=expense.category,
-            description=expense.description,
-            amount=expense.amount,
-            amount_paid=amount_paid,
-            amount_due=amount_due,
-            expense_date=expense.expense_date,
-            status=expense.status,
-            vendor_name=expense.vendor_name,
-            created_at=expense.created_at
-        )
-        expense_list.append(expense_item)
-
-    return expense_list
+    return await fetch_page(db, query, _EXPENSE_LIST_ADAPTER, limit=limit)
 
-@router.get("/summary", response_model=ExpenseSummary)
-async def get_expense_summary(
-    date_from: Optional[date] = Query(None),
-    date_to: Optional[date] = Query(None),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get expense summary statistics"""
+async def compute_expense_summary(
+    date_from: Optional[date],
+    date_to: Optional[date]
+) -> ExpenseSummary:
+    """Compute expense summary statistics"""
     # Build date filters
     date_filters = []
     if date_from:
@@ -136,61 +148,75 @@ async def get_expense_summary(
     if date_to:
         date_filters.append(Expense.expense_date <= date_to)
 
-    # Total amount
-    total_query_stmt = select(func.coalesce(func.sum(Expense.amount), 0))
-    if date_filters:
-        total_query_stmt = total_query_stmt.where(and_(*date_filters))
-    total_result = await db.execute(total_query_stmt)
-    total_amount = float(total_result.scalar() or 0)
-
-    # Paid amount - sum of amount_paid across all expenses
-    paid_query_stmt = select(func.coalesce(func.sum(Expense.amount_paid), 0))
-    if date_filters:
-        paid_query_stmt = paid_query_stmt.where(and_(*date_filters))
-    paid_result = await db.execute(paid_query_stmt)
-    paid_amount = float(paid_result.scalar() or 0)
-
-    # Pending amount - total amount minus paid amount
-    pending_amount = total_amount - paid_amount
-
-    # Total due - calculated as (amount - amount_paid) for pending expenses
+    # Total, paid and due amounts in a single scan
+    # Total due is calculated as (amount - amount_paid) for pending expenses
     # This ensures accuracy even if amount_due field wasn't properly set
-    due_filters = [Expense.status == ExpenseStatusEnum.PENDING]
-    if date_filters:
-        due_filters.extend(date_filters)
-    due_query_stmt = select(
+    totals_query_stmt = select(
+        func.coalesce(func.sum(Expense.amount), 0).label('total_amount'),
+        func.coalesce(func.sum(Expense.amount_paid), 0).label('paid_amount'),
         func.coalesce(
-            func.sum(Expense.amount - func.coalesce(Expense.amount_paid, 0)),
+            func.sum(
+                case(
+                    (Expense.status == ExpenseStatusEnum.PENDING,
+                     Expense.amount - func.coalesce(Expense.amount_paid, 0)),
+                    else_=0
+                )
+            ),
             0
-        )
-    ).where(and_(*due_filters))
-    due_result = await db.execute(due_query_stmt)
-    total_due = float(due_result.scalar() or 0)
+        ).label('total_due')
+    )
+    if date_filters:
+        totals_query_stmt = totals_query_stmt.where(and_(*date_filters))
 
     # Expense by category
-    category_query_stmt = select(Expense.category, func.sum(Expense.amount))
+    category_query_stmt = select(Expense.category.label('category'), func.sum(Expense.amount).label('total'))
     if date_filters:
         category_query_stmt = category_query_stmt.where(and_(*date_filters))
     category_query_stmt = category_query_stmt.group_by(Expense.category)
-    category_result = await db.execute(category_query_stmt)
-    expense_by_category = {str(row[0].value if hasattr(row[0], 'value') else row[0]): float(row[1]) for row in category_result.all()}
 
-    # Monthly trend (last 12 months)
+    # Monthly trend (last 12 months), only calculated if no date filters
+    include_trend = not date_from and not date_to
+    statements = [totals_query_stmt, category_query_stmt]
+    if include_trend:
+        # One grouped query for all months instead of one query per month,
+        # bucketed and formatted as YYYY-MM by the database
+        month_bucket = func.to_char(func.date_trunc('month', Expense.expense_date), 'YYYY-MM').label('month')
+        statements.append(
+            select(month_bucket, func.coalesce(func.sum(Expense.amount), 0).label('total'))
+            .where(Expense.expense_date >= func.date_trunc('month', func.current_date()) - text("interval '11 months'"))
+            .group_by(month_bucket)
+        )
+
+    # The queries are independent, so they run concurrently
+    totals_rows, category_rows, *month_rows = await asyncio.gather(
+        *(read_rows(stmt) for stmt in statements)
+    )
+
+    totals = totals_rows[0]
+    total_amount = float(totals['total_amount'] or 0)
+    paid_amount = float(totals['paid_amount'] or 0)
+    total_due = float(totals['total_due'] or 0)
+
+    # Pending amount - total amount minus paid amount
+    pending_amount = total_amount - paid_amount
+
+    # The Enum column always returns ExpenseCategoryEnum members, keyed by value
+    expense_by_category = {row['category'].value: float(row['total']) for row in category_rows}
+
     monthly_trend = {}
-    if not date_from and not date_to:  # Only calculate trend if no date filters
-        for i in range(12):
-            month_date = (date.today().replace(day=1) - timedelta(days=30*i))
-            month_key = month_date.strftime("%Y-%m")
-
-            month_query = await db.execute(
-                select(func.coalesce(func.sum(Expense.amount), 0)).where(
-                    and_(
-                        extract('year', Expense.expense_date) == month_date.year,
-                        extract('month', Expense.expense_date) == month_date.month
-                    )
-                )
-            )
-            monthly_trend[month_key] = float(month_query.scalar())
+    if include_trend:
+        # Keys for this month and the 11 before it, newest first. Months are
+        # counted on year * 12 + month so every key is a distinct calendar month
+        today = date.today()
+        month_index = today.year * 12 + today.month - 1
+        month_keys = [
+            f"{(month_index - i) // 12:04d}-{(month_index - i) % 12 + 1:02d}"
+            for i in range(12)
+        ]
+        month_totals = {row['month']: float(row['total']) for row in month_rows[0]}
+
+        # Months without expenses are reported as 0
+        monthly_trend = {key: month_totals.get(key, 0.0) for key in month_keys}
 
     return ExpenseSummary(
         total_amount=total_amount,
@@ -201,8 +227,19 @@ async def get_expense_summary(
         monthly_trend=monthly_trend
     )
 
+@router.get("/summary", response_model=ExpenseSummary)
+async def get_expense_summary(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None)
+):
+    """Get expense summary statistics, served from _report_cache until the next write"""
+    return await _report_cache.get_or_compute(
+        ("summary", date_from, date_to),
+        lambda: compute_expense_summary(date_from, date_to)
+    )
+
 @router.get("/{expense_id}", response_model=ExpenseResponse)
-async def get_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
+async def get_expense(expense_id: int, db: AsyncSession = Depends(get_readonly_db)):
     """Get expense by ID"""
     result = await db.execute(select(Expense).where(Expense.id == expense_id))
     expense = result.scalar_one_or_none()
@@ -219,43 +256,55 @@ async def update_expense(
     db: AsyncSession = Depends(get_db)
 ):
     """Update expense information with debt management"""
-    result = await db.execute(select(Expense).where(Expense.id == expense_id))
-    expense = result.scalar_one_or_none()
-
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-
-    # Update fields that were provided
     update_data = expense_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(expense, field, value)
 
-    # Recalculate amount_due and status if amount or amount_paid changed
+    # Recalculate amount_due and status if amount or amount_paid changed.
+    # This runs inside the UPDATE, where columns still hold their old values,
+    # so each side is taken from the request when provided and from the row
+    # otherwise
     if 'amount' in update_data or 'amount_paid' in update_data:
-        expense.amount_due = expense.amount - (expense.amount_paid or 0.0)
+        amount = literal(update_data['amount'], Float) if 'amount' in update_data else Expense.amount
+        amount_paid = func.coalesce(
+            literal(update_data['amount_paid'], Float) if 'amount_paid' in update_data else Expense.amount_paid,
+            0.0
+        )
+        update_data['amount_due'] = amount - amount_paid
 
         # Auto-compute status based on payment
-        if expense.amount_paid >= expense.amount:
-            expense.status = ExpenseStatusEnum.PAID
-        else:
-            expense.status = ExpenseStatusEnum.PENDING
+        update_data['status'] = cast(
+            case(
+                (amount_paid >= amount, literal(ExpenseStatusEnum.PAID, Expense.status.type)),
+                else_=literal(ExpenseStatusEnum.PENDING, Expense.status.type)
+            ),
+            Expense.status.type
+        )
+
+    # Single UPDATE ... RETURNING instead of SELECT, UPDATE and refresh
+    if update_data:
+        stmt = update(Expense).where(Expense.id == expense_id).values(**update_data).returning(Expense)
+    else:
+        stmt = select(Expense).where(Expense.id == expense_id)
+    result = await db.execute(stmt)
+    expense = result.scalar_one_or_none()
+
+    if not expense:
+        raise HTTPException(status_code=404, detail="Expense not found")
 
     await db.commit()
-    await db.refresh(expense)
+    await _report_cache.invalidate(db)
 
     return expense
 
 @router.delete("/{expense_id}")
 async def delete_expense(expense_id: int, db: AsyncSession = Depends(get_db)):
     """Delete expense"""
-    result = await db.execute(select(Expense).where(Expense.id == expense_id))
-    expense = result.scalar_one_or_none()
+    result = await db.execute(delete(Expense).where(Expense.id == expense_id).returning(Expense.id))
 
-    if not expense:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    await db.delete(expense)
     await db.commit()
+    await _report_cache.invalidate(db)
 
     return {"message": "Expense deleted successfully"}
 
@@ -267,30 +316,28 @@ async def update_expense_status(
     db: AsyncSession = Depends(get_db)
 ):
     """Update expense payment status"""
-    result = await db.execute(select(Expense).where(Expense.id == expense_id))
+    values = {"status": status}
+    if status == ExpenseStatusEnum.PAID:
+        values["payment_date"] = payment_date or date.today()
+
+    result = await db.execute(
+        update(Expense).where(Expense.id == expense_id).values(**values).returning(Expense)
+    )
     expense = result.scalar_one_or_none()
 
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    expense.status = status
-    if status == ExpenseStatusEnum.PAID and payment_date:
-        expense.payment_date = payment_date
-    elif status == ExpenseStatusEnum.PAID and not payment_date:
-        expense.payment_date = date.today()
-
     await db.commit()
-    await db.refresh(expense)
+    await _report_cache.invalidate(db)
 
     return expense
 
-@router.get("/categories/breakdown")
-async def get_category_breakdown(
-    month: Optional[int] = Query(None, ge=1, le=12),
-    year: Optional[int] = Query(None, ge=2020),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get expense breakdown by category for a specific month/year"""
+async def compute_category_breakdown(
+    month: Optional[int],
+    year: Optional[int]
+) -> List[dict]:
+    """Compute expense breakdown by category for a specific month/year"""
     filters = []
 
     if month and year:
@@ -304,7 +351,7 @@ async def get_category_breakdown(
         filters.append(extract('year', Expense.expense_date) == current_year)
 
     query = select(
-        Expense.category,
+        Expense.category.label('category'),
         func.sum(Expense.amount).label('total'),
         func.count(Expense.id).label('count')
     )
@@ -314,20 +361,28 @@ async def get_category_breakdown(
 
     query = query.group_by(Expense.category)
 
-    result = await db.execute(query)
-    breakdown = []
+    return [
+        {
+            "category": str(row['category']),
+            "total_amount": float(row['total']),
+            "expense_count": row['count']
+        }
+        for row in await read_rows(query)
+    ]
 
-    for row in result.all():
-        breakdown.append({
-            "category": str(row[0]),
-            "total_amount": float(row[1]),
-            "expense_count": row[2]
-        })
-
-    return breakdown
+@router.get("/categories/breakdown")
+async def get_category_breakdown(
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2020)
+):
+    """Get expense breakdown by category, served from _report_cache until the next write"""
+    return await _report_cache.get_or_compute(
+        ("breakdown", month, year),
+        lambda: compute_category_breakdown(month, year)
+    )
 
 @router.get("/pending/overdue")
-async def get_overdue_expenses(db: AsyncSession = Depends(get_db)):
+async def get_overdue_expenses(db: AsyncSession = Depends(get_readonly_db)):
     """Get overdue pending expenses"""
     today = date.today()
 
@@ -352,21 +407,29 @@ async def bulk_update_status(
     db: AsyncSession = Depends(get_db)
 ):
     """Bulk update expense status"""
-    # Get all expenses
-    result = await db.execute(
-        select(Expense).where(Expense.id.in_(expense_ids))
-    )
-    expenses = result.scalars().all()
+    # The ids are bound as one array parameter (id = ANY(:ids)) rather than an
+    # expanded IN list, so the SQL text is the same for any number of ids and
+    # asyncpg reuses its prepared statements instead of parsing a new one
+    ids_match = Expense.id == any_(literal(expense_ids, ARRAY(Integer)))
 
-    if len(expenses) != len(expense_ids):
+    # Count matches instead of loading every expense
+    found = await db.scalar(select(func.count(Expense.id)).where(ids_match))
+
+    if found != len(expense_ids):
         raise HTTPException(status_code=404, detail="Some expenses not found")
 
-    # Update all expenses
-    for expense in expenses:
-        expense.status = status
-        if status == ExpenseStatusEnum.PAID:
-            expense.payment_date = payment_date or date.today()
+    # Update all expenses in a single statement
+    values = {"status": status}
+    if status == ExpenseStatusEnum.PAID:
+        values["payment_date"] = payment_date or date.today()
 
+    await db.execute(
+        update(Expense)
+        .where(ids_match)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
+    await _report_cache.invalidate(db)
 
-    return {"message": f"Updated {len(expenses)} expenses successfully"}
\ No newline at end of file
+    return {"message": f"Updated {found} expenses successfully"}
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from typing import List, Optional
-from database import get_db
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, update, delete, exists, func, and_, or_
+from pydantic import TypeAdapter
+from typing import List, Literal, Optional
+from database import get_db, get_readonly_db, read_rows
+from services.cache import DataVersion, ResponseCache
+from services.listing import fetch_page, ordered_filters
 from models.guest import (
     Guest, GuestCreate, GuestUpdate, GuestResponse,
     GuestListResponse, GuestSearchFilters
@@ -10,6 +14,40 @@ from models.guest import (
 
 router = APIRouter()
 
+# Order in which list filters are applied: ranges first, then substring
+# matches, which are the most expensive predicates to evaluate
+_GUEST_FILTER_PRIORITY = {
+    'min_bookings': 1, 'min_spent': 1,
+    'phone': 2, 'email': 2,
+    'full_name': 3, 'city': 3,
+}
+
+# Sort order for each top guests ranking
+_TOP_GUEST_ORDER = {
+    'spent': Guest.total_spent.desc(),
+    'bookings': Guest.total_bookings.desc(),
+}
+
+_GUEST_LIST_ADAPTER = TypeAdapter(List[GuestListResponse])
+
+# Unique index behind Guest.phone (unique=True, index=True); only violations
+# of this index are reported as a duplicate phone number
+_PHONE_UNIQUE_INDEX = "ix_guests_phone"
+
+# Top guest rankings, keyed by sort and limit; every write bumps the shared
+# guests version, so no worker serves rankings from before it
+_stats_cache = ResponseCache(DataVersion("guests"), maxsize=64, ttl=30)
+
+
+def _is_duplicate_phone(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a unique violation of the phone index"""
+    orig = error.orig
+    return (
+        getattr(orig, "sqlstate", None) == "23505"
+        and getattr(orig.__cause__, "constraint_name", None) == _PHONE_UNIQUE_INDEX
+    )
+
+
 @router.post("/", response_model=GuestResponse, status_code=201)
 async def create_guest(
     guest_data: GuestCreate,
@@ -17,10 +55,10 @@ async def create_guest(
 ):
     """Create a new guest"""
     # Check if guest with same phone already exists
-    existing_guest = await db.execute(
-        select(Guest).where(Guest.phone == guest_data.phone)
+    phone_taken = await db.scalar(
+        select(exists().where(Guest.phone == guest_data.phone))
     )
-    if existing_guest.scalar_one_or_none():
+    if phone_taken:
         raise HTTPException(
             status_code=400,
             detail="Guest with this phone number already exists"
@@ -28,7 +66,18 @@ async def create_guest(
 
     guest = Guest(**guest_data.dict())
     db.add(guest)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not _is_duplicate_phone(e):
+            raise
+        # Another request added the same phone between the check and the insert
+        raise HTTPException(
+            status_code=400,
+            detail="Guest with this phone number already exists"
+        )
+    await _stats_cache.invalidate(db)
     await db.refresh(guest)
 
     return guest
@@ -43,58 +92,57 @@ async def list_guests(
     min_spent: Optional[float] = Query(None, ge=0),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Get list of guests with optional filters"""
-    query = select(Guest)
+    # Only the list view columns are selected
+    query = select(
+        Guest.id,
+        Guest.full_name,
+        Guest.phone,
+        Guest.email,
+        Guest.total_bookings,
+        Guest.total_spent,
+        Guest.last_visit
+    )
 
     filters = []
     if full_name:
-        filters.append(Guest.full_name.ilike(f"%{full_name}%"))
+        filters.append((_GUEST_FILTER_PRIORITY['full_name'], Guest.full_name.ilike(f"%{full_name}%")))
     if phone:
-        filters.append(Guest.phone.ilike(f"%{phone}%"))
+        filters.append((_GUEST_FILTER_PRIORITY['phone'], Guest.phone.ilike(f"%{phone}%")))
     if email:
-        filters.append(Guest.email.ilike(f"%{email}%"))
+        filters.append((_GUEST_FILTER_PRIORITY['email'], Guest.email.ilike(f"%{email}%")))
     if city:
-        filters.append(Guest.city.ilike(f"%{city}%"))
+        filters.append((_GUEST_FILTER_PRIORITY['city'], Guest.city.ilike(f"%{city}%")))
     if min_bookings is not None:
-        filters.append(Guest.total_bookings >= min_bookings)
+        filters.append((_GUEST_FILTER_PRIORITY['min_bookings'], Guest.total_bookings >= min_bookings))
     if min_spent is not None:
-        filters.append(Guest.total_spent >= min_spent)
+        filters.append((_GUEST_FILTER_PRIORITY['min_spent'], Guest.total_spent >= min_spent))
 
     if filters:
-        query = query.where(and_(*filters))
+        query = query.where(ordered_filters(filters))
 
     query = query.order_by(Guest.last_visit.desc().nulls_last()).offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    guests = result.scalars().all()
-
-    # Convert to list response format
-    guest_list = []
-    for guest in guests:
-        guest_item = GuestListResponse(
-            id=guest.id,
-            full_name=guest.full_name,
-            phone=guest.phone,
-            email=guest.email,
-            total_bookings=guest.total_bookings,
-            total_spent=guest.total_spent,
-            last_visit=guest.last_visit
-        )
-        guest_list.append(guest_item)
-
-    return guest_list
+    return await fetch_page(db, query, _GUEST_LIST_ADAPTER, limit=limit)
 
 @router.get("/search")
 async def search_guests(
     q: str = Query(..., min_length=2, description="Search term"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Search guests by name, phone, or email"""
     search_term = f"%{q}%"
 
-    query = select(Guest).where(
+    # Select only the columns returned in the simplified search format
+    query = select(
+        Guest.id,
+        Guest.full_name,
+        Guest.phone,
+        Guest.email,
+        Guest.total_bookings
+    ).where(
         or_(
             Guest.full_name.ilike(search_term),
             Guest.phone.ilike(search_term),
@@ -103,23 +151,11 @@ async def search_guests(
     ).limit(10)
 
     result = await db.execute(query)
-    guests = result.scalars().all()
 
-    # Return simplified format for search results
-    search_results = []
-    for guest in guests:
-        search_results.append({
-            "id": guest.id,
-            "full_name": guest.full_name,
-            "phone": guest.phone,
-            "email": guest.email,
-            "total_bookings": guest.total_bookings
-        })
-
-    return search_results
+    return [dict(row._mapping) for row in result]
 
 @router.get("/{guest_id}", response_model=GuestResponse)
-async def get_guest(guest_id: int, db: AsyncSession = Depends(get_db)):
+async def get_guest(guest_id: int, db: AsyncSession = Depends(get_readonly_db)):
     """Get guest by ID"""
     result = await db.execute(select(Guest).where(Guest.id == guest_id))
     guest = result.scalar_one_or_none()
@@ -130,7 +166,7 @@ async def get_guest(guest_id: int, db: AsyncSession = Depends(get_db)):
     return guest
 
 @router.get("/phone/{phone}", response_model=GuestResponse)
-async def get_guest_by_phone(phone: str, db: AsyncSession = Depends(get_db)):
+async def get_guest_by_phone(phone: str, db: AsyncSession = Depends(get_readonly_db)):
     """Get guest by phone number"""
     result = await db.execute(select(Guest).where(Guest.phone == phone))
     guest = result.scalar_one_or_none()
@@ -147,64 +183,79 @@ async def update_guest(
     db: AsyncSession = Depends(get_db)
 ):
     """Update guest information"""
-    result = await db.execute(select(Guest).where(Guest.id == guest_id))
+    # Update fields that were provided with a single UPDATE ... RETURNING,
+    # so a missing guest is reported as 404 before the phone is checked
+    update_data = guest_data.dict(exclude_unset=True)
+    if update_data:
+        stmt = update(Guest).where(Guest.id == guest_id).values(**update_data).returning(Guest)
+    else:
+        stmt = select(Guest).where(Guest.id == guest_id)
+    try:
+        result = await db.execute(stmt)
+    except IntegrityError as e:
+        await db.rollback()
+        if not _is_duplicate_phone(e):
+            raise
+        # The unique index rejected a phone another guest already has
+        raise HTTPException(
+            status_code=400,
+            detail="Another guest with this phone number already exists"
+        )
     guest = result.scalar_one_or_none()
 
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
 
-    # Check if updating phone to an existing number
-    if guest_data.phone and guest_data.phone != guest.phone:
-        existing_guest = await db.execute(
-            select(Guest).where(
+    # Check if updating phone to an existing number, for databases created
+    # before phone was unique; the update is rolled back rather than committed
+    if guest_data.phone:
+        phone_taken = await db.scalar(
+            select(exists().where(
                 and_(
                     Guest.phone == guest_data.phone,
                     Guest.id != guest_id
                 )
-            )
+            ))
         )
-        if existing_guest.scalar_one_or_none():
+        if phone_taken:
+            await db.rollback()
             raise HTTPException(
                 status_code=400,
                 detail="Another guest with this phone number already exists"
             )
 
-    # Update fields that were provided
-    update_data = guest_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(guest, field, value)
-
     await db.commit()
-    await db.refresh(guest)
+    await _stats_cache.invalidate(db)
 
     return guest
 
 @router.delete("/{guest_id}")
 async def delete_guest(guest_id: int, db: AsyncSession = Depends(get_db)):
     """Delete guest"""
-    result = await db.execute(select(Guest).where(Guest.id == guest_id))
-    guest = result.scalar_one_or_none()
+    # Check if guest has any bookings before deleting
+    # This would require checking booking table - for now just delete
+    result = await db.execute(delete(Guest).where(Guest.id == guest_id).returning(Guest.id))
 
-    if not guest:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Guest not found")
 
-    # Check if guest has any bookings before deleting
-    # This would require checking booking table - for now just delete
-    await db.delete(guest)
     await db.commit()
+    await _stats_cache.invalidate(db)
 
     return {"message": "Guest deleted successfully"}
 
 @router.get("/{guest_id}/bookings")
 async def get_guest_bookings(
     guest_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Get all bookings for a guest (requires booking integration)"""
     # This endpoint will be fully implemented once booking integration is complete
     # For now, return placeholder
-    guest_result = await db.execute(select(Guest).where(Guest.id == guest_id))
-    guest = guest_result.scalar_one_or_none()
+    guest_result = await db.execute(
+        select(Guest.full_name, Guest.total_bookings, Guest.total_spent).where(Guest.id == guest_id)
+    )
+    guest = guest_result.one_or_none()
 
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
@@ -217,30 +268,27 @@ async def get_guest_bookings(
         "total_spent": guest.total_spent
     }
 
+async def compute_top_guests(by: str, limit: int) -> List[dict]:
+    """Compute top guests by bookings or amount spent"""
+    # Select only the columns returned for each top guest
+    query = select(
+        Guest.id,
+        Guest.full_name,
+        Guest.phone,
+        Guest.total_bookings,
+        Guest.total_spent,
+        Guest.last_visit
+    ).order_by(_TOP_GUEST_ORDER[by]).limit(limit)
+
+    return [dict(row) for row in await read_rows(query)]
+
 @router.get("/stats/top-guests")
 async def get_top_guests(
-    by: str = Query("bookings", description="Sort by 'bookings' or 'spent'"),
-    limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
+    by: Literal["bookings", "spent"] = Query("bookings", description="Sort by 'bookings' or 'spent'"),
+    limit: int = Query(10, ge=1, le=50)
 ):
-    """Get top guests by bookings or amount spent"""
-    if by == "spent":
-        query = select(Guest).order_by(Guest.total_spent.desc()).limit(limit)
-    else:
-        query = select(Guest).order_by(Guest.total_bookings.desc()).limit(limit)
-
-    result = await db.execute(query)
-    guests = result.scalars().all()
-
-    top_guests = []
-    for guest in guests:
-        top_guests.append({
-            "id": guest.id,
-            "full_name": guest.full_name,
-            "phone": guest.phone,
-            "total_bookings": guest.total_bookings,
-            "total_spent": guest.total_spent,
-            "last_visit": guest.last_visit
-        })
-
-    return top_guests
\ No newline at end of file
+    """Get top guests by bookings or amount spent, served from _stats_cache until the next write"""
+    return await _stats_cache.get_or_compute(
+        ("top", by, limit),
+        lambda: compute_top_guests(by, limit)
+    )
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, update, exists, func, and_, or_
+from pydantic import TypeAdapter
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_readonly_db, read_rows
+from services.cache import DataVersion, ResponseCache
+from services.listing import fetch_page, ordered_filters
 from models.room import (
     Room, RoomCreate, RoomUpdate, RoomResponse, RoomSummary,
     RoomTypeEnum, RoomStatusEnum
@@ -10,6 +13,18 @@ from models.room import (
 
 router = APIRouter()
 
+# Order in which list filters are applied: equality first, then ranges
+_ROOM_FILTER_PRIORITY = {
+    'status': 0, 'room_type': 0, 'floor': 0,
+    'min_price': 1, 'max_price': 1,
+}
+
+_ROOM_LIST_ADAPTER = TypeAdapter(List[RoomResponse])
+
+# Room summary results; every write bumps the shared rooms version, so no
+# worker serves counts from before it
+_summary_cache = ResponseCache(DataVersion("rooms"), maxsize=64, ttl=30)
+
 @router.post("/", response_model=RoomResponse, status_code=201)
 async def create_room(
     room_data: RoomCreate,
@@ -17,16 +32,17 @@ async def create_room(
 ):
     """Create a new room"""
     # Check if room number already exists
-    existing_room = await db.execute(
-        select(Room).where(Room.room_number == room_data.room_number)
+    number_taken = await db.scalar(
+        select(exists().where(Room.room_number == room_data.room_number))
     )
-    if existing_room.scalar_one_or_none():
+    if number_taken:
         raise HTTPException(status_code=400, detail="Room number already exists")
 
     # Create new room
     room = Room(**room_data.dict())
     db.add(room)
     await db.commit()
+    await _summary_cache.invalidate(db)
     await db.refresh(room)
 
     return room
@@ -40,60 +56,58 @@ async def list_rooms(
     max_price: Optional[float] = Query(None, ge=0),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Get list of rooms with optional filters"""
     query = select(Room)
 
+    # Paired price bounds collapse into a single BETWEEN range
     filters = []
     if status:
-        filters.append(Room.status == status)
+        filters.append((_ROOM_FILTER_PRIORITY['status'], Room.status == status))
     if room_type:
-        filters.append(Room.room_type == room_type)
+        filters.append((_ROOM_FILTER_PRIORITY['room_type'], Room.room_type == room_type))
     if floor is not None:
-        filters.append(Room.floor_number == floor)
-    if min_price is not None:
-        filters.append(Room.base_price >= min_price)
-    if max_price is not None:
-        filters.append(Room.base_price <= max_price)
+        filters.append((_ROOM_FILTER_PRIORITY['floor'], Room.floor_number == floor))
+    if min_price is not None and max_price is not None:
+        filters.append((_ROOM_FILTER_PRIORITY['min_price'], Room.base_price.between(min_price, max_price)))
+    elif min_price is not None:
+        filters.append((_ROOM_FILTER_PRIORITY['min_price'], Room.base_price >= min_price))
+    elif max_price is not None:
+        filters.append((_ROOM_FILTER_PRIORITY['max_price'], Room.base_price <= max_price))
 
     if filters:
-        query = query.where(and_(*filters))
+        query = query.where(ordered_filters(filters))
 
     query = query.order_by(Room.room_number).offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    rooms = result.scalars().all()
-
-    return rooms
-
-@router.get("/summary", response_model=RoomSummary)
-async def get_room_summary(db: AsyncSession = Depends(get_db)):
-    """Get room summary statistics"""
-    # Total counts by status
-    total_query = await db.execute(select(func.count(Room.id)))
-    total_rooms = total_query.scalar() or 0
-
-    active_query = await db.execute(
-        select(func.count(Room.id)).where(Room.status == RoomStatusEnum.ACTIVE)
+    return await fetch_page(db, query, _ROOM_LIST_ADAPTER, limit=limit, scalars=True)
+
+async def compute_room_summary() -> RoomSummary:
+    """Compute room summary statistics"""
+    # Counts by status and by type in a single scan: with GROUPING SETS each
+    # row is grouped by exactly one of the two columns and the other is NULL
+    counts_rows = await read_rows(
+        select(
+            Room.status.label('status'),
+            Room.room_type.label('room_type'),
+            func.count(Room.id).label('count')
+        )
+        .group_by(func.grouping_sets(Room.status, Room.room_type))
     )
-    active_rooms = active_query.scalar() or 0
 
-    inactive_query = await db.execute(
-        select(func.count(Room.id)).where(Room.status == RoomStatusEnum.INACTIVE)
-    )
-    inactive_rooms = inactive_query.scalar() or 0
+    status_counts = {}
+    room_types = {}
+    for row in counts_rows:
+        if row['status'] is not None:
+            status_counts[row['status']] = row['count']
+        else:
+            room_types[row['room_type']] = row['count']
 
-    maintenance_query = await db.execute(
-        select(func.count(Room.id)).where(Room.status == RoomStatusEnum.UNDER_MAINTENANCE)
-    )
-    under_maintenance = maintenance_query.scalar() or 0
-
-    # Room types distribution
-    type_query = await db.execute(
-        select(Room.room_type, func.count(Room.id)).group_by(Room.room_type)
-    )
-    room_types = {row[0]: row[1] for row in type_query.all()}
+    total_rooms = sum(status_counts.values())
+    active_rooms = status_counts.get(RoomStatusEnum.ACTIVE, 0)
+    inactive_rooms = status_counts.get(RoomStatusEnum.INACTIVE, 0)
+    under_maintenance = status_counts.get(RoomStatusEnum.UNDER_MAINTENANCE, 0)
 
     return RoomSummary(
         total_rooms=total_rooms,
@@ -103,8 +117,13 @@ async def get_room_summary(db: AsyncSession = Depends(get_db)):
         room_types=room_types
     )
 
+@router.get("/summary", response_model=RoomSummary)
+async def get_room_summary():
+    """Get room summary statistics, served from _summary_cache until the next write"""
+    return await _summary_cache.get_or_compute(("summary",), compute_room_summary)
+
 @router.get("/{room_id}", response_model=RoomResponse)
-async def get_room(room_id: int, db: AsyncSession = Depends(get_db)):
+async def get_room(room_id: int, db: AsyncSession = Depends(get_readonly_db)):
     """Get room by ID"""
     result = await db.execute(select(Room).where(Room.id == room_id))
     room = result.scalar_one_or_none()
@@ -121,40 +140,45 @@ async def update_room(
     db: AsyncSession = Depends(get_db)
 ):
     """Update room information"""
-    result = await db.execute(select(Room).where(Room.id == room_id))
+    # Update fields that were provided with a single UPDATE ... RETURNING
+    update_data = room_data.dict(exclude_unset=True)
+    if update_data:
+        stmt = update(Room).where(Room.id == room_id).values(**update_data).returning(Room)
+    else:
+        stmt = select(Room).where(Room.id == room_id)
+    result = await db.execute(stmt)
     room = result.scalar_one_or_none()
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
-    # Update fields that were provided
-    update_data = room_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(room, field, value)
-
     await db.commit()
-    await db.refresh(room)
+    await _summary_cache.invalidate(db)
 
     return room
 
 @router.delete("/{room_id}")
 async def delete_room(room_id: int, db: AsyncSession = Depends(get_db)):
     """Delete room (soft delete - mark as inactive)"""
-    result = await db.execute(select(Room).where(Room.id == room_id))
-    room = result.scalar_one_or_none()
+    # Check if room has active bookings before allowing deletion
+    # This would require checking booking table - for now just mark inactive
+    result = await db.execute(
+        update(Room)
+        .where(Room.id == room_id)
+        .values(status=RoomStatusEnum.INACTIVE)
+        .returning(Room.id)
+    )
 
-    if not room:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Room not found")
 
-    # Check if room has active bookings before allowing deletion
-    # This would require checking booking table - for now just mark inactive
-    room.status = RoomStatusEnum.INACTIVE
     await db.commit()
+    await _summary_cache.invalidate(db)
 
     return {"message": "Room deactivated successfully"}
 
 @router.get("/number/{room_number}", response_model=RoomResponse)
-async def get_room_by_number(room_number: str, db: AsyncSession = Depends(get_db)):
+async def get_room_by_number(room_number: str, db: AsyncSession = Depends(get_readonly_db)):
     """Get room by room number"""
     result = await db.execute(
         select(Room).where(Room.room_number == room_number)
@@ -173,15 +197,16 @@ async def update_room_status(
     db: AsyncSession = Depends(get_db)
 ):
     """Update room status only"""
-    result = await db.execute(select(Room).where(Room.id == room_id))
+    result = await db.execute(
+        update(Room).where(Room.id == room_id).values(status=status).returning(Room)
+    )
     room = result.scalar_one_or_none()
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
-    room.status = status
     await db.commit()
-    await db.refresh(room)
+    await _summary_cache.invalidate(db)
 
     return room
 
@@ -189,7 +214,7 @@ async def update_room_status(
 async def get_available_rooms_for_dates(
     check_in: str = Query(..., description="Check-in date (YYYY-MM-DD)"),
     check_out: str = Query(..., description="Check-out date (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """Get available rooms for given dates (requires booking integration)"""
     # This endpoint will be fully implemented once booking model is integrated
@@ -198,4 +223,4 @@ async def get_available_rooms_for_dates(
     result = await db.execute(query)
     rooms = result.scalars().all()
 
-    return rooms
\ No newline at end of file
+    return rooms
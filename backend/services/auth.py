@@ -6,30 +6,216 @@ including password hashing, JWT token generation/validation, and user management
 
 Security Features:
 - Password hashing using bcrypt with automatic salt generation
+- Optional SHA-256 pre-hashing so passwords longer than bcrypt's 72-byte limit count in full
 - JWT tokens for stateless authentication
 - Separate access and refresh tokens for security
 - Token expiration handling
+- Verified token payloads cached until expiry, so reused tokens skip decoding
 
 Note: This module uses in-memory storage for demonstration purposes.
 In production, integrate with the PostgreSQL database.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+import asyncio
+import concurrent.futures
+import multiprocessing
+from typing import List, Optional
+import jwt
+from cachetools import TLRUCache
+import base64
 import bcrypt
+import functools
+import hashlib
+import hmac
+import orjson
+import os
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config import settings
 import uuid
 
+# JWT signing parameters bound once at import, so the per-request decode and
+# encode calls skip the settings lookups and algorithm list allocation
+_JWT_SECRET = settings.jwt_secret
+_JWT_ALGORITHM = settings.jwt_algorithm
+_decode = functools.partial(jwt.decode, key=_JWT_SECRET, algorithms=[_JWT_ALGORITHM])
+
+# base64url of the fixed header {"alg":"HS256","typ":"JWT"}
+_HS256_HEADER = b"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+_JWT_KEY = _JWT_SECRET.encode('utf-8')
+
+
+def _b64url(data: bytes) -> bytes:
+    """base64url without padding, as used for each JWT segment"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _encode_hs256(claims: dict) -> str:
+    """
+    Encode and sign an HS256 JWT without going through PyJWT.
+
+    The header never changes, so it is precomputed; the claims are
+    serialized with orjson and signed with hmac directly. The result is a
+    standard token that jwt.decode verifies like any other.
+    """
+    signing_input = _HS256_HEADER + b"." + _b64url(orjson.dumps(claims))
+    signature = hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode('ascii')
+
+
+# Tokens are issued through the fast path when signing with HS256
+if _JWT_ALGORITHM == "HS256":
+    _encode = _encode_hs256
+else:
+    _encode = functools.partial(jwt.encode, key=_JWT_SECRET, algorithm=_JWT_ALGORITHM)
+
+# Token lifetimes in seconds
+_ACCESS_TOKEN_TTL = settings.access_token_expire_minutes * 60
+_REFRESH_TOKEN_TTL = 7 * 24 * 60 * 60
+
 # OAuth2 password bearer scheme for extracting tokens from Authorization header
 # tokenUrl specifies the endpoint for obtaining tokens (for Swagger UI integration)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 # In-memory user storage (temporary - should be replaced with database queries)
-# Structure: {email: {id, email, hashed_password, role}}
+# Structure: {email: {id, email, hashed_password (bcrypt bytes), password_prehashed, role}}
 users_db: dict = {}
+# Secondary index over the same user dicts, keyed by user id: {id: user}
+users_by_id: dict = {}
+
+# Roles allowed through require_admin
+_ADMIN_ROLES = frozenset(("admin", "super_admin"))
+
+# Longest time a verified token payload is reused without decoding again
+JWT_CACHE_TTL = 60
+
+
+def _jwt_cache_expiry(key: bytes, payload: dict, now: float) -> float:
+    """Cached payloads expire with their token, or after JWT_CACHE_TTL if sooner"""
+    return min(payload["exp"], now + JWT_CACHE_TTL)
+
+
+# Verified token payloads keyed by SHA-256 of the token. Entries use wall-clock
+# time so they can expire exactly at the token's own "exp" claim.
+_jwt_cache = TLRUCache(maxsize=10000, ttu=_jwt_cache_expiry, timer=time.time)
+
+
+def _verify_cached(token: str) -> dict:
+    """
+    Decode and verify a JWT, reusing the payload of a recently verified token.
+
+    Only successful verifications are cached; invalid or expired tokens
+    raise jwt.PyJWTError every time.
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        The verified token payload
+
+    Raises:
+        jwt.PyJWTError: If the token is invalid or expired
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _jwt_cache.get(key)
+    if payload is None:
+        payload = _decode(token)
+        if "exp" in payload:
+            _jwt_cache[key] = payload
+    return payload
+
+
+def _password_bytes(password: str, prehash: bool) -> bytes:
+    """
+    Encode a password as bcrypt input.
+
+    bcrypt ignores everything past 72 bytes. Pre-hashing reduces any password
+    to a fixed 44-byte base64 SHA-256 digest (base64 avoids the NUL bytes
+    bcrypt cannot accept), so every character counts and each call does the
+    same work.
+    """
+    encoded = password.encode('utf-8')
+    if prehash:
+        return base64.b64encode(hashlib.sha256(encoded).digest())
+    return encoded
+
+
+# bcrypt encodes salts with its own base64 alphabet ("./A-Za-z0-9", no padding)
+_BCRYPT_B64 = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+)
+
+
+def _format_salt(raw: bytes, rounds: int) -> bytes:
+    """Format 16 random bytes as a bcrypt salt, as bcrypt.gensalt() would"""
+    encoded = base64.b64encode(raw).rstrip(b"=").translate(_BCRYPT_B64)
+    return b"$2b$%02d$%s" % (rounds, encoded)
+
+
+# Prefixes of every bcrypt hash variant checkpw accepts
+_BCRYPT_PREFIXES = (b"$2a$", b"$2b$", b"$2y$")
+
+# bcrypt work runs in separate processes so concurrent logins and signups use
+# several cores instead of contending for the GIL. The workers are top-level
+# functions so they can be pickled, and take every setting as an argument.
+# The pool is created on first use, from a forkserver rather than by forking
+# the server process, and each app worker caps it at settings.bcrypt_workers.
+_bcrypt_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def _get_bcrypt_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the bcrypt process pool, starting it on first use"""
+    global _bcrypt_pool
+    if _bcrypt_pool is None:
+        _bcrypt_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, min(settings.bcrypt_workers, os.cpu_count() or 1)),
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _bcrypt_pool
+
+
+def shutdown_bcrypt_pool() -> None:
+    """Stop the bcrypt worker processes, if they were started (app shutdown)"""
+    global _bcrypt_pool
+    if _bcrypt_pool is not None:
+        _bcrypt_pool.shutdown(wait=True, cancel_futures=True)
+        _bcrypt_pool = None
+
+
+def _hash_worker(password: str, rounds: int, prehash: bool) -> bytes:
+    """Hash a password with bcrypt (runs in _bcrypt_pool)"""
+    return bcrypt.hashpw(_password_bytes(password, prehash), bcrypt.gensalt(rounds))
+
+
+def _verify_worker(password: str, hashed_password: bytes, prehashed: bool) -> bool:
+    """Check a password against a bcrypt hash (runs in _bcrypt_pool)"""
+    # A corrupted or non-bcrypt hash can never match; reject it without
+    # running the full key schedule
+    if not hashed_password.startswith(_BCRYPT_PREFIXES):
+        return False
+    return bcrypt.checkpw(_password_bytes(password, prehashed), hashed_password)
+
+
+async def _run_bcrypt(worker, *args):
+    """Run a bcrypt worker in the process pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_get_bcrypt_pool(), worker, *args)
+
+
+# Hash checked against when a login email is unknown, so unknown and known
+# emails take the same bcrypt time and cannot be told apart by timing. It is
+# computed in the pool on first use rather than at import, which would cost
+# every app worker and bcrypt process a full-cost hash.
+_dummy_hash: Optional[bytes] = None
+
+
+async def _get_dummy_hash() -> bytes:
+    """Return the dummy bcrypt hash, computing it on first use"""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await _run_bcrypt(_hash_worker, "dummy", settings.bcrypt_rounds, False)
+    return _dummy_hash
 
 
 class AuthService:
@@ -40,32 +226,64 @@ class AuthService:
     password hashing/verification, JWT token creation, and user management.
     """
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    def verify_password(self, plain_password: str, hashed_password: bytes, prehashed: bool = False) -> bool:
         """
         Verify a plain text password against a bcrypt hash.
 
         Args:
             plain_password: The password to verify
             hashed_password: The bcrypt hash to check against
+            prehashed: Whether the hash was created from a pre-hashed password
 
         Returns:
             True if password matches, False otherwise
         """
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return _verify_worker(plain_password, hashed_password, prehashed)
 
-    def hash_password(self, password: str) -> str:
+    def hash_password(self, password: str, rounds: Optional[int] = None, prehash: Optional[bool] = None) -> bytes:
         """
         Hash a password using bcrypt with automatic salt generation.
 
         Args:
             password: Plain text password to hash
+            rounds: bcrypt cost factor (defaults to settings.bcrypt_rounds)
+            prehash: Pre-hash with SHA-256 (defaults to settings.prehash_passwords)
 
         Returns:
-            Bcrypt hash string suitable for database storage
+            Bcrypt hash bytes, stored as-is so verification needs no re-encoding
         """
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        if prehash is None:
+            prehash = settings.prehash_passwords
+        return _hash_worker(password, rounds or settings.bcrypt_rounds, prehash)
 
-    def create_access_token(self, user_id: str) -> str:
+    def hash_passwords_batch(self, passwords: List[str], rounds: Optional[int] = None) -> List[bytes]:
+        """
+        Hash many passwords at once, e.g. for bulk user imports.
+
+        Salts for the whole batch come from a single os.urandom() call
+        instead of one random read per bcrypt.gensalt() call. Single signups
+        keep using hash_password().
+
+        Args:
+            passwords: Plain text passwords to hash
+            rounds: bcrypt cost factor (defaults to settings.bcrypt_rounds)
+
+        Returns:
+            Bcrypt hashes, in the same order as passwords, pre-hashed
+            according to settings.prehash_passwords
+        """
+        rounds = rounds or settings.bcrypt_rounds
+        prehash = settings.prehash_passwords
+        randomness = os.urandom(16 * len(passwords))
+        return [
+            bcrypt.hashpw(
+                _password_bytes(password, prehash),
+                _format_salt(randomness[i * 16:(i + 1) * 16], rounds)
+            )
+            for i, password in enumerate(passwords)
+        ]
+
+    def create_access_token(self, user_id: str, email: Optional[str] = None) -> str:
         """
         Create a short-lived JWT access token.
 
@@ -74,15 +292,18 @@ class AuthService:
 
         Args:
             user_id: User identifier to embed in token
+            email: User's email, embedded so the user can be looked up directly
 
         Returns:
             Encoded JWT access token string
         """
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+        expire = int(time.time()) + _ACCESS_TOKEN_TTL
         data = {"sub": user_id, "exp": expire, "type": "access"}
-        return jwt.encode(data, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+        if email:
+            data["email"] = email
+        return _encode(data)
 
-    def create_refresh_token(self, user_id: str) -> str:
+    def create_refresh_token(self, user_id: str, email: Optional[str] = None) -> str:
         """
         Create a long-lived JWT refresh token.
 
@@ -91,27 +312,31 @@ class AuthService:
 
         Args:
             user_id: User identifier to embed in token
+            email: User's email, embedded so the user can be looked up directly
 
         Returns:
             Encoded JWT refresh token string
         """
-        expire = datetime.utcnow() + timedelta(days=7)
+        expire = int(time.time()) + _REFRESH_TOKEN_TTL
         data = {"sub": user_id, "exp": expire, "type": "refresh"}
-        return jwt.encode(data, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+        if email:
+            data["email"] = email
+        return _encode(data)
 
-    def create_tokens(self, user_id: str) -> dict:
+    def create_tokens(self, user_id: str, email: Optional[str] = None) -> dict:
         """
         Create both access and refresh tokens for a user.
 
         Args:
             user_id: User identifier to embed in tokens
+            email: User's email to embed in tokens
 
         Returns:
             Dictionary containing access_token, refresh_token, and token_type
         """
         return {
-            "access_token": self.create_access_token(user_id),
-            "refresh_token": self.create_refresh_token(user_id),
+            "access_token": self.create_access_token(user_id, email),
+            "refresh_token": self.create_refresh_token(user_id, email),
             "token_type": "bearer",
         }
 
@@ -132,8 +357,18 @@ class AuthService:
         if email in users_db:
             raise HTTPException(status_code=400, detail="Email already registered")
         user_id = str(uuid.uuid4())
-        user = {"id": user_id, "email": email, "hashed_password": self.hash_password(password)}
+        # bcrypt is deliberately slow, so hash in the process pool to keep
+        # the event loop serving other requests
+        prehashed = settings.prehash_passwords
+        hashed_password = await _run_bcrypt(_hash_worker, password, settings.bcrypt_rounds, prehashed)
+        user = {
+            "id": user_id,
+            "email": email,
+            "hashed_password": hashed_password,
+            "password_prehashed": prehashed,
+        }
         users_db[email] = user
+        users_by_id[user_id] = user
         return {"id": user_id, "email": email}
 
     async def authenticate_user(self, email: str, password: str) -> Optional[dict]:
@@ -148,8 +383,20 @@ class AuthService:
             User dictionary if authentication succeeds, None otherwise
         """
         user = users_db.get(email)
-        if not user or not self.verify_password(password, user["hashed_password"]):
+        if not user:
+            # Spend the same bcrypt time as a real check before failing
+            await _run_bcrypt(_verify_worker, password, await _get_dummy_hash(), settings.prehash_passwords)
+            return None
+        # Verify in the process pool, bcrypt would otherwise block the event loop
+        prehashed = user.get("password_prehashed", False)
+        if not await _run_bcrypt(_verify_worker, password, user["hashed_password"], prehashed):
             return None
+
+        # Upgrade hashes created before pre-hashing was enabled, now that the
+        # plain password is known to be correct
+        if settings.prehash_passwords and not prehashed:
+            user["hashed_password"] = await _run_bcrypt(_hash_worker, password, settings.bcrypt_rounds, True)
+            user["password_prehashed"] = True
         return user
 
     async def refresh_tokens(self, refresh_token: str) -> Optional[dict]:
@@ -163,13 +410,13 @@ class AuthService:
             New token pair if refresh token is valid, None otherwise
         """
         try:
-            payload = jwt.decode(refresh_token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+            payload = _verify_cached(refresh_token)
             # Ensure this is actually a refresh token, not an access token
             if payload.get("type") != "refresh":
                 return None
             user_id = payload.get("sub")
-            return self.create_tokens(user_id)
-        except JWTError:
+            return self.create_tokens(user_id, payload.get("email"))
+        except jwt.PyJWTError:
             return None
 
 # Optional OAuth2 scheme that doesn't raise errors for missing tokens
@@ -182,6 +429,49 @@ oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=
 # =============================================================================
 # These functions are used with Depends() to inject user context into routes
 
+def _auth_failure(detail: str, raise_on_error: bool) -> None:
+    """Raise a 401 for required authentication; optional authentication just gets None"""
+    if raise_on_error:
+        raise HTTPException(status_code=401, detail=detail)
+    return None
+
+
+async def _resolve_user(token: Optional[str], *, raise_on_error: bool) -> Optional[dict]:
+    """
+    Resolve a bearer token to the user it was issued for.
+
+    Shared by get_current_user and get_current_user_optional, which differ
+    only in how a missing or invalid token is reported.
+
+    Args:
+        token: JWT token from the Authorization header, if any
+        raise_on_error: Raise 401 on failure instead of returning None
+
+    Returns:
+        User dictionary with id, email, and role, or None on failure when
+        raise_on_error is False
+    """
+    if not token:
+        return _auth_failure("Not authenticated", raise_on_error)
+    try:
+        # Decode and validate the JWT token
+        payload = _verify_cached(token)
+    except jwt.PyJWTError:
+        return _auth_failure("Invalid token", raise_on_error)
+
+    user_id = payload.get("sub")
+    if not user_id:
+        return _auth_failure("Invalid token", raise_on_error)
+
+    # Tokens carry the email, which is the users_db key; the id index covers
+    # tokens issued without it. Either way the user must match the subject.
+    email = payload.get("email")
+    user = users_db.get(email) if email else users_by_id.get(user_id)
+    if not user or user["id"] != user_id:
+        return _auth_failure("User not found", raise_on_error)
+    return {"id": user["id"], "email": user["email"], "role": user.get("role", "customer")}
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """
     FastAPI dependency to get the currently authenticated user.
@@ -198,21 +488,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     Raises:
         HTTPException: 401 if token is invalid or user not found
     """
-    try:
-        # Decode and validate the JWT token
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        # Find user by id in the database
-        for user in users_db.values():
-            if user["id"] == user_id:
-                return {"id": user["id"], "email": user["email"], "role": user.get("role", "customer")}
-
-        raise HTTPException(status_code=401, detail="User not found")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return await _resolve_user(token, raise_on_error=True)
 
 
 async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme_optional)) -> Optional[dict]:
@@ -229,21 +505,7 @@ async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme
     Returns:
         User dictionary if authenticated, None otherwise
     """
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id = payload.get("sub")
-        if not user_id:
-            return None
-
-        # Find user by id
-        for user in users_db.values():
-            if user["id"] == user_id:
-                return {"id": user["id"], "email": user["email"], "role": user.get("role", "customer")}
-        return None
-    except JWTError:
-        return None
+    return await _resolve_user(token, raise_on_error=False)
 
 
 async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
@@ -263,7 +525,7 @@ async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
         HTTPException: 403 if user doesn't have admin privileges
     """
     role = current_user.get("role", "customer")
-    if role not in ["admin", "super_admin"]:
+    if role not in _ADMIN_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
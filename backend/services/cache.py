@@ -0,0 +1,122 @@
+"""
+Response Cache Module
+
+This module provides a small in-process cache for read endpoints whose
+results are expensive to compute (table-wide aggregates for dashboards and
+reports) but change far less often than they are polled.
+
+Cache Behaviour:
+- Every cached result is filed under a data version kept in a PostgreSQL
+  sequence, so all gunicorn workers see the same version
+- Every committed write bumps the version, so results from before the write
+  are never served again by any worker
+- Entries also expire after a short TTL, bounding memory held by old versions
+- Concurrent misses for the same key are coalesced behind a lock, so only
+  one request runs the underlying queries while the others wait for its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from cachetools import TTLCache
+from sqlalchemy import Sequence, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import REGCLASS
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import Base, engine
+
+
+class DataVersion:
+    """
+    Write counter shared by every worker process.
+
+    The counter is a PostgreSQL sequence registered on Base.metadata, so it is
+    created together with the tables. Reading it is a single function call,
+    far cheaper than the aggregates it guards.
+
+    Args:
+        name: Prefix of the sequence name, e.g. the table the version covers
+    """
+
+    def __init__(self, name: str):
+        self._sequence = Sequence(f"{name}_data_version", metadata=Base.metadata)
+        # NULL until the first write, which reads as version 0
+        self._current = select(
+            func.pg_sequence_last_value(cast(literal(self._sequence.name), REGCLASS))
+        )
+
+    async def current(self) -> int:
+        """Return the version as of the last committed write"""
+        async with engine.connect() as conn:
+            return await conn.scalar(self._current) or 0
+
+    async def bump(self, db: AsyncSession) -> None:
+        """
+        Advance the version after a committed write.
+
+        Call it after commit: a bump before commit would let another worker
+        cache pre-write data under the new version. nextval is not
+        transactional, so the bump holds even though the session's new
+        transaction is never committed.
+        """
+        await db.execute(select(self._sequence.next_value()))
+
+
+class ResponseCache:
+    """
+    Versioned TTL cache for computed endpoint results.
+
+    Args:
+        version: Shared data version the cached results depend on
+        maxsize: Maximum number of cached results
+        ttl: Seconds a result stays valid
+    """
+
+    def __init__(self, version: DataVersion, maxsize: int = 64, ttl: float = 30):
+        self.version = version
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+
+    async def invalidate(self, db: AsyncSession) -> None:
+        """Make every cached result unreachable, in all workers, after a committed write"""
+        await self.version.bump(db)
+
+    async def get_or_compute(
+        self,
+        parts: Tuple,
+        compute: Callable[[], Awaitable[Any]],
+        version: Optional[int] = None
+    ) -> Any:
+        """
+        Return the cached result for parts, computing and storing it on a miss.
+
+        The key is fixed before computing, so a write that lands while the
+        queries run leaves the result filed under the old version, where it
+        can never be read. compute should open its own session, so a hit
+        needs no session at all.
+
+        Args:
+            parts: Hashable values identifying the result (endpoint, params)
+            compute: Coroutine function producing the result on a miss
+            version: Data version already read by the caller, if any
+
+        Returns:
+            The cached or freshly computed result
+        """
+        if version is None:
+            version = await self.version.current()
+        key = (version, *parts)
+        value = self._entries.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the entry while we waited
+                value = self._entries.get(key)
+                if value is None:
+                    value = await compute()
+                    self._entries[key] = value
+        finally:
+            self._locks.pop(key, None)
+
+        return value
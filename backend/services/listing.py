@@ -0,0 +1,86 @@
+"""
+List Query Helpers
+
+This module holds the pieces shared by the paginated list endpoints, so each
+route only describes its columns and filters.
+
+Helpers:
+- STREAM_THRESHOLD / STREAM_CHUNK_SIZE bound how list pages of ORM entities
+  are streamed, so only one chunk of entities is loaded at a time
+- ordered_filters() combines (priority, clause) pairs into one WHERE clause,
+  emitting the cheapest and most selective predicates first
+- fetch_page() runs a list query, validates the page with a prebuilt
+  TypeAdapter and serializes it straight to a JSON response, streaming large
+  pages of ORM entities
+"""
+
+from typing import List, Tuple
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+# List pages larger than STREAM_THRESHOLD are streamed from the database in
+# chunks of STREAM_CHUNK_SIZE rows instead of being loaded all at once
+STREAM_THRESHOLD = 200
+STREAM_CHUNK_SIZE = 200
+
+
+def ordered_filters(filters: List[Tuple[int, ColumnElement]]) -> ColumnElement:
+    """
+    Combine list filters into a single clause, lowest priority value first.
+
+    List endpoints collect each filter as a (priority, clause) pair, so the
+    cheapest and most selective predicates are emitted first whatever order
+    the query parameters were checked in.
+
+    Args:
+        filters: (priority, clause) pairs collected by a list endpoint
+
+    Returns:
+        The AND of all clauses, ordered by priority
+    """
+    return and_(*(clause for _, clause in sorted(filters, key=lambda f: f[0])))
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    adapter: TypeAdapter,
+    *,
+    limit: int,
+    scalars: bool = False
+) -> Response:
+    """
+    Run a list query and return the page as JSON serialized by a prebuilt adapter.
+
+    Pages of ORM entities (scalars=True) larger than STREAM_THRESHOLD are
+    streamed and validated STREAM_CHUNK_SIZE entities at a time, so the
+    entities of only one chunk are loaded at once. Column rows are small and
+    are always fetched in a single round trip.
+
+    The adapter writes the JSON body itself, and FastAPI returns a Response
+    as-is, so the page skips response_model validation and jsonable_encoder.
+
+    Args:
+        db: Session to run the query on
+        query: The filtered, ordered and limited SELECT
+        adapter: TypeAdapter for a list of the response model
+        limit: Page size requested by the client
+        scalars: Whether the query selects a single ORM entity per row
+
+    Returns:
+        A JSON response with the validated page
+    """
+    if scalars and limit > STREAM_THRESHOLD:
+        result = await db.stream(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        page = []
+        async for partition in result.scalars().partitions():
+            page.extend(adapter.validate_python(partition, from_attributes=True))
+    else:
+        result = await db.execute(query)
+        rows = result.scalars().all() if scalars else result.all()
+        page = adapter.validate_python(rows, from_attributes=True)
+
+    return Response(adapter.dump_json(page), media_type="application/json")
@@ -2,6 +2,10 @@
 -- This file runs on first container startup
 
 
+-- Trigram matching for indexed ILIKE '%term%' searches
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+
 -- Users table for authentication
 CREATE TABLE IF NOT EXISTS users (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),